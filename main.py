@@ -3,46 +3,48 @@ def process_work_experience(text):
     Process the WORK EXPERIENCE section so that each '-' line is a bullet point.
     Returns a list of (is_bullet, text) tuples for updating the docx.
     """
-    lines = [l.rstrip() for l in text.split('\n')]
-    processed = []
-    for line in lines:
-        if line.strip().startswith('-'):
-            processed.append((True, line.lstrip('-').strip()))
-        else:
-            processed.append((False, line.strip()))
-    return processed
+    lines = (l.strip() for l in text.split('\n'))
+    return [(True, line.lstrip('-').lstrip()) if line.startswith('-') else (False, line)
+            for line in lines]
 
 def update_work_experience(doc, indices, processed_lines):
     """
     Update the work experience section in the docx.
     Bullet points for lines marked as bullets, regular text otherwise.
     """
+    paras = doc.paragraphs
     for i, idx in enumerate(indices):
-        para = doc.paragraphs[idx]
-        para.clear()
+        para = paras[idx]
         if i < len(processed_lines):
             is_bullet, text = processed_lines[i]
-            run = para.add_run(text)
+            # New lines don't map onto the old title/bullet paragraphs, so
+            # start from plain formatting rather than the old run's
+            _replace_para_text(para, text, keep_format=False)
             if is_bullet:
                 para.style = 'List Bullet'
             else:
                 para.style = None
         else:
-            para.text = ''
+            _replace_para_text(para, '', keep_format=False)
+# Bullet markers and whitespace trimmed from skills lines
+_STRIP_CHARS = '-•* \t'
+
 def process_core_competencies(text):
     """
     Process the CORE COMPETENCIES section to ensure each bullet is 1-2 words and bolded.
     Returns a list of (text, formatting) tuples for updating the docx.
     """
-    import re
-    # Split into lines, filter out empty, and keep only 1-2 word entries
-    lines = [l.strip('-•* 	') for l in text.split('\n') if l.strip()]
     bullets = []
-    for line in lines:
-        # Only keep 1-2 word entries
-        words = line.split()
-        if 1 <= len(words) <= 2:
-            bullets.append(' '.join(words))
+    for line in text.split('\n'):
+        line = line.strip(_STRIP_CHARS)
+        if not line:
+            continue
+        # Only keep 1-2 word entries; a third token means the line is too long
+        words = line.split(None, 2)
+        if len(words) == 1:
+            bullets.append(words[0])
+        elif len(words) == 2:
+            bullets.append(f"{words[0]} {words[1]}")
     return bullets
 
 def update_core_competencies(doc, indices, bullets):
@@ -50,67 +52,123 @@ def update_core_competencies(doc, indices, bullets):
     Update the skills section in the docx with bolded bullet points (1-2 words each).
     Each paragraph in indices is replaced with a bullet, bolded.
     """
-    from docx.oxml.ns import qn
+    paras = doc.paragraphs
     for i, idx in enumerate(indices):
-        para = doc.paragraphs[idx]
-        para.clear()
+        para = paras[idx]
         if i < len(bullets):
-            run = para.add_run(f"• {bullets[i]}")
-            run.bold = True
+            _replace_para_text(para, f"• {bullets[i]}", bold=True)
             # Optionally, set style to match original (if needed)
         else:
-            para.text = ''
-def extract_section_text(doc, indices, word_limit=None):
+            _replace_para_text(para, '')
+def extract_section_text(doc, indices, word_limit=None, texts=None):
     """
     Extract text from a list of paragraph indices. Optionally limit total word count.
+    texts, if given, is the precomputed paragraph_texts(doc) list.
     Returns a single string with paragraphs joined by newlines.
     """
-    paras = [doc.paragraphs[i].text for i in indices]
+    if texts is None:
+        texts = paragraph_texts(doc)
+    paras = [texts[i] for i in indices]
     if word_limit is not None:
-        words = []
-        for para in paras:
-            for w in para.split():
-                if len(words) < word_limit:
-                    words.append(w)
-        # Rebuild paragraphs with limited words
+        # Single pass: keep whole paragraphs while they fit, truncate the one that doesn't
         out = []
-        idx = 0
+        remaining = word_limit
         for para in paras:
-            para_words = para.split()
-            if idx + len(para_words) > word_limit:
-                out.append(' '.join(words[idx:word_limit]))
-                break
+            tokens = para.split()
+            if len(tokens) <= remaining:
+                out.append(para)
+                remaining -= len(tokens)
             else:
-                out.append(' '.join(words[idx:idx+len(para_words)]))
-                idx += len(para_words)
+                out.append(' '.join(tokens[:remaining]))
+                break
         return '\n'.join(out)
     return '\n'.join(paras)
 
+def _replace_para_text(para, new_line, bold=None, keep_format=True):
+    """
+    Replace a paragraph's text with new_line, keeping the first run's formatting
+    unless keep_format is False. Like para.clear(), removes all other content
+    (runs, hyperlinks, fields) but keeps paragraph properties.
+    Sets the run's bold flag if bold is given.
+    """
+    p = para._p
+    first = p.find(_W_R)
+    for child in list(p):
+        if child is not first and child.tag != _W_PPR:
+            p.remove(child)
+    if first is not None:
+        if not keep_format and first.rPr is not None:
+            first.remove(first.rPr)
+        run = para.runs[0]
+        run.text = new_line
+    else:
+        run = para.add_run(new_line)
+    if bold is not None:
+        run.bold = bold
+
 def update_section_text(doc, indices, new_text):
     """
     Update the text of paragraphs at the given indices with new_text (split by lines).
-    Preserves formatting by updating only the text in each run.
+    Preserves formatting by keeping the first run of each paragraph.
     """
     lines = new_text.split('\n')
+    paras = doc.paragraphs
     for i, idx in enumerate(indices):
         if i < len(lines):
-            para = doc.paragraphs[idx]
-            new_line = lines[i]
-            if para.runs:
-                start = 0
-                for run in para.runs:
-                    run_len = len(run.text)
-                    run.text = new_line[start:start+run_len]
-                    start += run_len
-                if start < len(new_line) and para.runs:
-                    para.runs[-1].text += new_line[start:]
-            else:
-                para.text = new_line
+            _replace_para_text(paras[idx], lines[i])
         # If fewer lines, leave extra paragraphs unchanged
 
-def parse_docx_sections(doc):
+# WordprocessingML tag names, in lxml's {namespace}name form
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_R, _W_HYPERLINK, _W_T = _W + 'r', _W + 'hyperlink', _W + 't'
+_W_PPR = _W + 'pPr'
+_W_BR, _W_BR_TYPE = _W + 'br', _W + 'type'
+# Run children that python-docx's Run.text renders as a fixed string
+_W_RUN_CHARS = {_W + 'tab': '\t', _W + 'ptab': '\t', _W + 'cr': '\n', _W + 'noBreakHyphen': '-'}
+
+def _p_element_text(p):
+    """
+    Return the text of a <w:p> element the way python-docx's Paragraph.text does:
+    only direct runs and runs inside hyperlinks, with tabs and line breaks kept.
+    Text boxes and other nested content are not included.
+    """
+    parts = []
+    for child in p.iterchildren(_W_R, _W_HYPERLINK):
+        runs = child.iterchildren(_W_R) if child.tag == _W_HYPERLINK else (child,)
+        for r in runs:
+            for item in r:
+                tag = item.tag
+                if tag == _W_T:
+                    parts.append(item.text or "")
+                elif tag == _W_BR:
+                    # Page and column breaks have no text; only line breaks do
+                    if item.get(_W_BR_TYPE, 'textWrapping') == 'textWrapping':
+                        parts.append('\n')
+                elif tag in _W_RUN_CHARS:
+                    parts.append(_W_RUN_CHARS[tag])
+    return "".join(parts)
+
+def _fast_para_text(para):
+    """
+    Return a paragraph's text by reading its XML directly.
+    Skips the Run objects python-docx builds for para.text.
+    """
+    return _p_element_text(para._p)
+
+# Section codes used by parse_docx_sections to assign each paragraph
+_OTHER, _WORK, _SKILLS, _INTRO = 0, 1, 2, 3
+
+def paragraph_texts(doc):
+    """
+    Return the text of every paragraph in the document, in order.
+    Computed once so callers can share it instead of re-reading para.text.
+    """
+    return [_fast_para_text(p) for p in doc.paragraphs]
+
+def parse_docx_sections(doc, texts=None):
     """
     Parse the docx into logical sections: intro, skills, work experience, and others.
+    texts, if given, is the precomputed paragraph_texts(doc) list.
     Returns a dict with section names as keys and lists of paragraph indices as values.
     """
     section_map = {
@@ -125,48 +183,82 @@ def parse_docx_sections(doc):
     work_header = 'WORK EXPERIENCE'
     # Track section starts
     intro_start = skills_start = work_start = None
-    for i, para in enumerate(doc.paragraphs):
-        text = para.text.strip().upper()
-        if intro_header in text:
+    # All-caps header indices, used to find where work experience ends
+    headers = []
+    if texts is None:
+        texts = paragraph_texts(doc)
+    n = len(texts)
+    # Single pass over the text, recording the first occurrence of each section
+    # header and every all-caps header along the way
+    for i, text in enumerate(texts):
+        t = text.strip()
+        upper = t.upper()
+        if intro_start is None and intro_header in upper:
             intro_start = i
-        elif text == skills_header:
+        elif skills_start is None and upper == skills_header:
             skills_start = i
-        elif text == work_header:
+        elif work_start is None and upper == work_header:
             work_start = i
-    # Find section ranges
-    n = len(doc.paragraphs)
+        if t.isupper() and len(t) > 3:
+            headers.append(i)
+            # Once all sections are located, the next header ends work experience
+            if None not in (intro_start, skills_start, work_start) and i > work_start:
+                break
+    # Section code per paragraph; bytearray slice assignment fills whole ranges at once
+    assign = bytearray(n)  # zero-filled, i.e. every paragraph starts as _OTHER
     # Intro: first paragraph after intro_header (just one paragraph)
     if intro_start is not None:
         # Only the next paragraph is the intro content
         if intro_start + 1 < n:
             section_map['intro'] = [intro_start + 1]
+            assign[intro_start + 1] = _INTRO
     # Skills: first paragraph after skills_header until work_header
-    if skills_start is not None and work_start is not None:
+    if skills_start is not None and work_start is not None and skills_start < work_start:
         section_map['skills'] = list(range(skills_start+1, work_start))
+        assign[skills_start+1:work_start] = bytes([_SKILLS]) * (work_start - skills_start - 1)
     # Work experience: from first paragraph after work_header until next all-caps header or end
     if work_start is not None:
-        # Find next all-caps header after work_start
-        next_header = n
-        for i in range(work_start+1, n):
-            t = doc.paragraphs[i].text.strip()
-            if t.isupper() and len(t) > 3:
-                next_header = i
-                break
+        next_header = next((h for h in headers if h > work_start), n)
         section_map['work_experience'] = list(range(work_start+1, next_header))
+        assign[work_start+1:next_header] = bytes([_WORK]) * (next_header - work_start - 1)
     # All other paragraphs
-    used = set(section_map['intro'] or []) | set(section_map['skills'] or []) | set(section_map['work_experience'] or [])
-    section_map['other'] = [i for i in range(n) if i not in used]
+    section_map['other'] = [i for i, a in enumerate(assign) if a == _OTHER]
     return section_map
 import os  # For file path operations
+import json  # For the on-disk Gemini response cache
+import mmap  # For reading large job description files
+import hashlib  # For hashing cache keys
 import sys  # For command-line arguments
 import getpass  # For securely entering API keys
+import shutil  # For locating the LibreOffice executable
+import subprocess  # For running LibreOffice headless
+import zipfile  # For reading document.xml straight out of a DOCX
+import pathlib  # For building file:// URIs for LibreOffice profiles
+import socket  # For waiting on the LibreOffice listener port
+import time  # For the LibreOffice listener startup timeout
 import docx  # For working with docx files
 from docx import Document  # Main class for docx manipulation
 from docx.shared import Pt  # For font size (not used directly here)
+from docx.oxml import OxmlElement, parse_xml  # For building and parsing raw XML
+from docx.oxml.ns import qn  # For namespaced XML tag names
 import requests  # For making HTTP requests to Gemini API
-from tempfile import NamedTemporaryFile  # For temporary file handling
+from requests.adapters import HTTPAdapter  # For pooling Gemini connections
+from tempfile import NamedTemporaryFile, TemporaryDirectory  # For temporary file handling
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # For concurrent Gemini requests and batch runs
+from itertools import repeat  # For passing the API key to every batch job
 from docx2pdf import convert  # For converting docx to PDF
 
+# Gemini model used for rewriting; part of the cache key
+GEMINI_MODEL = "gemini-1.5-pro"
+# On-disk cache of Gemini responses, keyed by prompt and model
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "resume-updater")
+# Text files larger than this (bytes) are read through mmap
+MMAP_THRESHOLD = 64 * 1024
+
+# Shared session so concurrent Gemini calls reuse TCP/TLS connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 def prompt_file_path(prompt_text):
     """
     Prompt the user for a file path until a valid file is provided.
@@ -179,13 +271,34 @@ def read_docx_text(docx_path):
     Read all text from a DOCX file and return both the text and the Document object.
     """
     doc = Document(docx_path)
-    text = "\n".join([p.text for p in doc.paragraphs])
+    text = "\n".join(_fast_para_text(p) for p in doc.paragraphs)
     return text, doc
 
+def read_docx_text_fast(docx_path):
+    """
+    Read all paragraph text from a DOCX file by parsing word/document.xml directly.
+    For read-only inputs such as the job description; skips building a Document.
+    """
+    with zipfile.ZipFile(docx_path) as z:
+        # python-docx's parser, which does not resolve entities in untrusted files
+        root = parse_xml(z.read('word/document.xml'))
+    # Only the body's own paragraphs, matching doc.paragraphs (no tables,
+    # content controls or text boxes)
+    return "\n".join(
+        _p_element_text(p) for p in root.xpath('./w:body/w:p')
+    )
+
 def read_txt_file(txt_path):
     """
     Read and return the contents of a text file.
+    Files over MMAP_THRESHOLD bytes are decoded straight from a memory map.
     """
+    if os.path.getsize(txt_path) > MMAP_THRESHOLD:
+        with open(txt_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, 'utf-8')
+        # Match the newline translation text mode does on the small-file path
+        return text.replace('\r\n', '\n').replace('\r', '\n')
     with open(txt_path, 'r', encoding='utf-8') as f:
         return f.read()
 
@@ -196,31 +309,99 @@ def get_gemini_api_key():
     print("You need a Gemini API key. Get one at https://aistudio.google.com/app/apikey")
     return getpass.getpass("Enter your Gemini API key (input hidden): ")
 
-def call_gemini(api_key, resume_text, job_desc):
+def _gemini_cache_path(prompt):
     """
-    Call the Gemini API to rewrite the resume based on the job description.
-    Returns the improved resume text.
+    Return the cache file path for a Gemini prompt, keyed by its SHA-256 and the model.
     """
-    url = "https://generativelanguage.googleapis.com/v1/models/gemini-1.5-pro:generateContent?key=" + api_key
-    # Construct the prompt for the AI model
-    prompt = f"""
-You are an expert resume writer. Given the following resume and job description, rewrite the resume to best match the job description, keeping the original formatting and structure as much as possible. Only update the content where relevant. Return the improved resume content only.
+    key = hashlib.sha256((prompt + '\0' + GEMINI_MODEL).encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, key[:2], key + ".json")
 
-Resume:
-{resume_text}
+def _read_gemini_cache(cache_path):
+    """
+    Return the cached Gemini response text, or None on a cache miss.
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)['text']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _write_gemini_cache(cache_path, text):
+    """
+    Atomically write a Gemini response to the cache. Failures are ignored.
+    """
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        with NamedTemporaryFile('w', encoding='utf-8', dir=cache_dir, suffix='.tmp', delete=False) as tmp:
+            json.dump({'model': GEMINI_MODEL, 'text': text}, tmp)
+        os.replace(tmp.name, cache_path)
+    except OSError as err:
+        print("Could not write Gemini cache:", err)
+
+def build_intro_prompt(intro_text, job_desc):
+    """
+    Build the Gemini prompt that rewrites the intro paragraph for the job description.
+    """
+    return f"""
+You are an expert resume writer. Rewrite the following resume intro paragraph to best match the job description. Keep it to a single paragraph of similar length. Return only the rewritten paragraph, with no heading or commentary.
+
+Intro paragraph:
+{intro_text}
 
 Job Description:
 {job_desc}
 """
+
+def build_skills_prompt(skills_text, job_desc):
+    """
+    Build the Gemini prompt that rewrites the core competencies list for the job description.
+    """
+    return f"""
+You are an expert resume writer. Rewrite the following resume skills list to best match the job description. Keep about the same number of skills. Each skill must be 1-2 words. Return only the skills, one per line, with no heading, bullets, or commentary.
+
+Skills:
+{skills_text}
+
+Job Description:
+{job_desc}
+"""
+
+def build_work_prompt(work_text, job_desc):
+    """
+    Build the Gemini prompt that rewrites the work experience section for the job description.
+    """
+    return f"""
+You are an expert resume writer. Rewrite the following resume work experience section to best match the job description. Keep every employer, location, and job title line, and keep the same line structure. Start each bullet point line with '-'. Only update the content where relevant. Return only the rewritten section, with no heading or commentary.
+
+Work experience:
+{work_text}
+
+Job Description:
+{job_desc}
+"""
+
+def call_gemini(api_key, prompt):
+    """
+    Send a prompt to the Gemini API and return the response text.
+    """
+    url = f"https://generativelanguage.googleapis.com/v1/models/{GEMINI_MODEL}:generateContent?key=" + api_key
+    # The prompt embeds both the resume and job description, so it identifies the request
+    cache_path = _gemini_cache_path(prompt)
+    cached = _read_gemini_cache(cache_path)
+    if cached is not None:
+        return cached
     data = {
         "contents": [{"parts": [{"text": prompt}]}]
     }
     try:
-        response = requests.post(url, json=data)
+        response = _SESSION.post(url, json=data, timeout=60)
         response.raise_for_status()
         result = response.json()
         # Extract the improved resume text from the API response
-        return result['candidates'][0]['content']['parts'][0]['text']
+        text = result['candidates'][0]['content']['parts'][0]['text']
+        _write_gemini_cache(cache_path, text)
+        return text
     except requests.exceptions.HTTPError as http_err:
         print("HTTP error occurred:", http_err)
         try:
@@ -238,109 +419,269 @@ Job Description:
 
 def update_docx_with_text(doc, new_text):
     """
-    Update the Document object with new text, preserving formatting by editing text within runs.
+    Update the Document object with new text, preserving formatting by keeping each paragraph's first run.
     Each line in new_text replaces the corresponding paragraph's text.
     """
     lines = new_text.split('\n')
-    for i, para in enumerate(doc.paragraphs):
+    paras = doc.paragraphs
+    for i, para in enumerate(paras):
         if i < len(lines):
-            new_line = lines[i]
-            # If paragraph has runs, update text in runs
-            if para.runs:
-                # Join all run texts to get original text length
-                total_len = sum(len(run.text) for run in para.runs)
-                # Split new_line into chunks matching run lengths
-                start = 0
-                for run in para.runs:
-                    run_len = len(run.text)
-                    run.text = new_line[start:start+run_len]
-                    start += run_len
-                # If new_line is longer, append to last run
-                if start < len(new_line) and para.runs:
-                    para.runs[-1].text += new_line[start:]
-            else:
-                para.text = new_line
+            _replace_para_text(para, lines[i])
         else:
             # Leave extra paragraphs unchanged to preserve formatting
             pass
-    # If more lines, add new paragraphs
-    for line in lines[len(doc.paragraphs):]:
-        doc.add_paragraph(line)
+    # If more lines, add new paragraphs, built as raw <w:p> elements and
+    # inserted ahead of the body's trailing sectPr like add_paragraph does
+    body = doc.element.body
+    sect_pr = body.find(qn('w:sectPr'))
+    for line in lines[len(paras):]:
+        p = OxmlElement('w:p')
+        r = OxmlElement('w:r')
+        t = OxmlElement('w:t')
+        t.set(qn('xml:space'), 'preserve')
+        t.text = line
+        r.append(t)
+        p.append(r)
+        if sect_pr is not None:
+            sect_pr.addprevious(p)
+        else:
+            body.append(p)
     return doc
 
-def main():
+def _free_port():
+    """
+    Return a localhost TCP port that is not currently in use.
+    """
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
 
-    print("--- Resume Auto-Updater with Gemini ---")
-    # Usage: python main.py resume.docx jobdesc.txt [API_KEY]
-    if len(sys.argv) < 3:
-        print("Usage: python main.py <resume.docx> <jobdesc.txt|jobdesc.docx> [API_KEY]")
-        sys.exit(1)
-    resume_path = sys.argv[1]
-    job_desc_path = sys.argv[2]
-    if len(sys.argv) >= 4:
-        api_key = sys.argv[3]
-    else:
-        api_key = get_gemini_api_key()
+def start_soffice_listener(profile_dir):
+    """
+    Start a headless LibreOffice that accepts UNO connections on a free localhost
+    port, so batch conversions share one process instead of starting one each.
+    Returns (process, unoconv connection URL), or None if LibreOffice or unoconv
+    is missing or the listener does not come up.
+    """
+    soffice = shutil.which('soffice') or shutil.which('libreoffice')
+    if soffice is None or shutil.which('unoconv') is None:
+        return None
+    port = _free_port()
+    accept = f"socket,host=localhost,port={port};urp;"
+    proc = subprocess.Popen(
+        [soffice, '--headless', '--invisible', '--nologo', '--norestore',
+         # A private profile keeps the listener separate from any running LibreOffice
+         '-env:UserInstallation=' + pathlib.Path(profile_dir).as_uri(),
+         '--accept=' + accept],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline and proc.poll() is None:
+        try:
+            with socket.create_connection(('localhost', port), timeout=1):
+                pass
+        except OSError:
+            time.sleep(0.2)
+            continue
+        # Only trust the port if our soffice is still the one running
+        if proc.poll() is None:
+            # unoconv needs the full UNO URL, including the object name
+            return proc, accept + "StarOffice.ComponentContext"
+    print("LibreOffice listener did not start; converting each PDF separately.")
+    stop_soffice_listener(proc)
+    return None
+
+def stop_soffice_listener(proc):
+    """
+    Shut down a LibreOffice listener started by start_soffice_listener.
+    """
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
 
+def convert_to_pdf(docx_path, pdf_path, uno_connection=None):
+    """
+    Convert a DOCX file to PDF. Uses LibreOffice headless when it is installed,
+    which avoids starting Word, and falls back to docx2pdf otherwise.
+    If uno_connection is given, the conversion goes to that running LibreOffice
+    listener through unoconv.
+    """
+    if uno_connection is not None:
+        # Write to a scratch path so a PDF left over from an earlier run can't
+        # pass for this conversion's output
+        with TemporaryDirectory() as scratch:
+            out_path = os.path.join(scratch, 'out.pdf')
+            try:
+                subprocess.run(
+                    ['unoconv', '--connection', uno_connection, '-f', 'pdf', '-o', out_path, docx_path],
+                    check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+            except subprocess.CalledProcessError as err:
+                print("unoconv conversion failed; converting directly:", err)
+            else:
+                if os.path.exists(out_path):
+                    shutil.move(out_path, pdf_path)
+                    return
+                print("unoconv did not produce a PDF; converting directly.")
+    soffice = shutil.which('soffice') or shutil.which('libreoffice')
+    if soffice is None:
+        convert(docx_path, pdf_path)
+        return
+    # LibreOffice names its output after the input file, so convert into a
+    # scratch directory and move the result to the requested path
+    with TemporaryDirectory() as scratch:
+        outdir = os.path.join(scratch, 'out')
+        # A private profile, so an already-open LibreOffice (or another batch
+        # worker) doesn't swallow the job
+        profile_uri = pathlib.Path(scratch, 'profile').as_uri()
+        subprocess.run(
+            [soffice, '-env:UserInstallation=' + profile_uri,
+             '--headless', '--convert-to', 'pdf', '--outdir', outdir, docx_path],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        out_path = os.path.join(outdir, os.path.splitext(os.path.basename(docx_path))[0] + ".pdf")
+        if not os.path.exists(out_path):
+            raise RuntimeError(f"LibreOffice did not produce a PDF for {docx_path}")
+        shutil.move(out_path, pdf_path)
+
+def process_one(resume_path, job_desc_path, api_key, output_stem=None, uno_connection=None):
+    """
+    Update one resume for one job description and save the .docx and PDF.
+    Outputs are written next to the resume unless output_stem is given.
+    uno_connection is passed through to convert_to_pdf.
+    """
     resume_text, doc = read_docx_text(resume_path)
     if job_desc_path.lower().endswith('.docx'):
-        job_desc, _ = read_docx_text(job_desc_path)
+        job_desc = read_docx_text_fast(job_desc_path)
     else:
         job_desc = read_txt_file(job_desc_path)
 
-    # Parse docx into sections
-    section_map = parse_docx_sections(doc)
-    # Set word limits for each section (adjust as needed)
-    word_limits = {'intro': 70, 'skills': 60, 'work_experience': 250}
-    # Extract editable sections
-    editable_sections = {}
-    for sec in ['intro', 'skills', 'work_experience']:
-        indices = section_map[sec]
-        if indices:
-            editable_sections[sec] = extract_section_text(doc, indices, word_limit=word_limits[sec])
-        else:
-            editable_sections[sec] = ''
+    # Parse docx into sections, sharing one read of the paragraph text
+    texts = paragraph_texts(doc)
+    section_map = parse_docx_sections(doc, texts)
+    # Extract editable sections, each capped at a word limit (adjust as needed)
+    intro_text = skills_text = work_text = ''
+    if section_map['intro']:
+        intro_text = extract_section_text(doc, section_map['intro'], word_limit=70, texts=texts)
+    if section_map['skills']:
+        skills_text = extract_section_text(doc, section_map['skills'], word_limit=60, texts=texts)
+    if section_map['work_experience']:
+        work_text = extract_section_text(doc, section_map['work_experience'], word_limit=250, texts=texts)
 
-    # Prepare prompt for Gemini: only editable sections
-    resume_for_gemini = (
-        f"INTRO PARAGRAPH:\n{editable_sections['intro']}\n\n"
-        f"SKILLS SECTION:\n{editable_sections['skills']}\n\n"
-        f"WORK EXPERIENCE SECTION:\n{editable_sections['work_experience']}\n"
-    )
+    # Sections missing from the resume have nothing to rewrite
+    def _rewrite_intro():
+        if not intro_text:
+            return ''
+        return call_gemini(api_key, build_intro_prompt(intro_text, job_desc)).strip()
 
-    print("Contacting Gemini API to update your resume...")
-    new_resume_text = call_gemini(api_key, resume_for_gemini, job_desc)
+    def _rewrite_skills():
+        if not skills_text:
+            return []
+        return process_core_competencies(call_gemini(api_key, build_skills_prompt(skills_text, job_desc)))
 
+    def _rewrite_work():
+        if not work_text:
+            return []
+        return process_work_experience(call_gemini(api_key, build_work_prompt(work_text, job_desc)).strip())
 
-    # Split Gemini output back into sections (assume same order)
-    import re
-    intro_new, skills_new, work_new = '', '', ''
-    m = re.split(r'INTRO PARAGRAPH:|SKILLS SECTION:|WORK EXPERIENCE SECTION:', new_resume_text, flags=re.I)
-    if len(m) >= 4:
-        intro_new = m[1].strip()
-        skills_new = m[2].strip()
-        work_new = m[3].strip()
-    else:
-        work_new = new_resume_text.strip()
+    print("Contacting Gemini API to update your resume...")
+    # One request per section, sent concurrently since each is network-bound.
+    # Each response is also processed on its worker thread; the docx itself is
+    # not thread-safe, so all writes below stay on this thread.
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        intro_future = ex.submit(_rewrite_intro)
+        skills_future = ex.submit(_rewrite_skills)
+        work_future = ex.submit(_rewrite_work)
+    intro_new = intro_future.result()
+    skills_bullets = skills_future.result()
+    work_processed = work_future.result()
 
     # Update only allowed sections in docx if indices are present
     if section_map['intro']:
         update_section_text(doc, section_map['intro'], intro_new)
     if section_map['skills']:
-        skills_bullets = process_core_competencies(skills_new)
         update_core_competencies(doc, section_map['skills'], skills_bullets)
     if section_map['work_experience']:
-        work_processed = process_work_experience(work_new)
         update_work_experience(doc, section_map['work_experience'], work_processed)
 
-    updated_docx_path = os.path.splitext(resume_path)[0] + "_updated.docx"
+    if output_stem is None:
+        output_stem = os.path.splitext(resume_path)[0]
+    updated_docx_path = output_stem + "_updated.docx"
     doc.save(updated_docx_path)
     print(f"Updated .docx saved to: {updated_docx_path}")
 
     print("Converting to PDF...")
-    updated_pdf_path = os.path.splitext(resume_path)[0] + ".pdf"
-    convert(updated_docx_path, updated_pdf_path)
+    updated_pdf_path = output_stem + ".pdf"
+    convert_to_pdf(updated_docx_path, updated_pdf_path, uno_connection)
     print(f"PDF saved to: {updated_pdf_path}")
 
+def read_batch_file(batch_path):
+    """
+    Read (resume, job description) path pairs from a batch file, one pair per line.
+    The two paths are separated by a tab, so Windows paths need no quoting or escaping.
+    Blank lines and lines starting with # are skipped.
+    """
+    pairs = []
+    with open(batch_path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = [field.strip() for field in line.split('\t')]
+            if len(fields) != 2 or not all(fields):
+                raise ValueError(f"{batch_path}:{line_no}: expected '<resume.docx>\\t<jobdesc>', got {line!r}")
+            pairs.append((fields[0], fields[1]))
+    return pairs
+
+def process_batch(pairs, api_key):
+    """
+    Process independent (resume, job description) pairs in parallel worker processes.
+    Outputs are named after both files so one resume can be paired with several jobs.
+    PDFs are rendered by one shared LibreOffice listener when one can be started.
+    """
+    if not pairs:
+        print("No resume/job description pairs to process.")
+        return
+    resumes = [resume for resume, _ in pairs]
+    job_descs = [job_desc for _, job_desc in pairs]
+    output_stems = [
+        os.path.splitext(resume)[0] + "_" + os.path.splitext(os.path.basename(job_desc))[0]
+        for resume, job_desc in pairs
+    ]
+    workers = min(len(pairs), os.cpu_count() or 1)
+    with TemporaryDirectory() as profile_dir:
+        listener = start_soffice_listener(profile_dir)
+        proc, uno_connection = listener if listener is not None else (None, None)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                # Consume the iterator so worker exceptions are raised here
+                list(ex.map(process_one, resumes, job_descs, repeat(api_key),
+                            output_stems, repeat(uno_connection)))
+        finally:
+            if proc is not None:
+                stop_soffice_listener(proc)
+
+def main():
+
+    print("--- Resume Auto-Updater with Gemini ---")
+    # Usage: python main.py resume.docx jobdesc.txt [API_KEY]
+    #        python main.py --batch pairs.txt [API_KEY]
+    if len(sys.argv) < 3:
+        print("Usage: python main.py <resume.docx> <jobdesc.txt|jobdesc.docx> [API_KEY]")
+        print("       python main.py --batch <pairs.txt> [API_KEY]  (one tab-separated resume/job pair per line)")
+        sys.exit(1)
+    if len(sys.argv) >= 4:
+        api_key = sys.argv[3]
+    else:
+        api_key = get_gemini_api_key()
+
+    if sys.argv[1] == '--batch':
+        process_batch(read_batch_file(sys.argv[2]), api_key)
+    else:
+        process_one(sys.argv[1], sys.argv[2], api_key)
+
 if __name__ == "__main__":
     main()